@@ -1,12 +1,32 @@
 from __future__ import annotations
 
+import asyncio
+import uuid
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode
 
 import httpx
+import orjson
 
 from .config import settings
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+BATCH_LIMIT = 50
+
+
+def _flatten_params(params: Dict[str, Any], prefix: str = "") -> List[Tuple[str, Any]]:
+    items: List[Tuple[str, Any]] = []
+    for key, value in params.items():
+        name = f"{prefix}[{key}]" if prefix else str(key)
+        if isinstance(value, dict):
+            items.extend(_flatten_params(value, name))
+        elif isinstance(value, (list, tuple)):
+            items.extend(_flatten_params(dict(enumerate(value)), name))
+        else:
+            items.append((name, value))
+    return items
+
 
 class BitrixError(RuntimeError):
     pass
@@ -17,10 +37,17 @@ class BitrixClient:
         self._client = httpx.AsyncClient(
             base_url=settings.bitrix_webhook_base_url,
             timeout=settings.request_timeout_seconds,
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=settings.bitrix_pool_max,
+                max_keepalive_connections=settings.bitrix_pool_keepalive,
+            ),
         )
         self._folder_cache: Dict[str, str] = {}
         self._root_folder_id: Optional[str] = None
         self._uploads_parent_id: Optional[str] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._uploads_parent_lock: Optional[asyncio.Lock] = None
 
     async def close(self) -> None:
         await self._client.aclose()
@@ -34,17 +61,45 @@ class BitrixClient:
         json: Optional[Dict[str, Any]] = None,
         data: Optional[Dict[str, Any]] = None,
         files: Optional[Dict[str, Any]] = None,
+        content: Optional[AsyncIterator[bytes]] = None,
+        headers: Optional[Dict[str, str]] = None,
     ) -> Dict[str, Any]:
-        if http_method.upper() == "GET":
-            response = await self._client.get(method, params=params)
-        else:
-            response = await self._client.post(method, params=params, json=json, data=data, files=files)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(settings.bitrix_max_concurrent)
+        async with self._semaphore:
+            if http_method.upper() == "GET":
+                response = await self._client.get(method, params=params)
+            else:
+                response = await self._client.post(
+                    method,
+                    params=params,
+                    json=json,
+                    data=data,
+                    files=files,
+                    content=content,
+                    headers=headers,
+                )
         response.raise_for_status()
-        payload = response.json()
+        payload = orjson.loads(response.content)
         if "error" in payload:
             raise BitrixError(payload.get("error_description", payload["error"]))
         return payload
 
+    async def _batch(
+        self, cmd: Dict[str, Tuple[str, Dict[str, Any]]]
+    ) -> Tuple[Dict[str, Any], Dict[str, BitrixError]]:
+        commands = {
+            key: f"{method}?{urlencode(_flatten_params(params), safe='$[]')}" if params else method
+            for key, (method, params) in cmd.items()
+        }
+        data = await self._request("batch", json={"halt": 0, "cmd": commands})
+        batch_result = data.get("result") or {}
+        errors = {
+            key: BitrixError(f"Batch command '{key}' failed: {error.get('error_description') or error.get('error')}")
+            for key, error in (batch_result.get("result_error") or {}).items()
+        }
+        return batch_result.get("result") or {}, errors
+
     async def fetch_deal_fields(self) -> Dict[str, Any]:
         data = await self._request("crm.deal.fields", http_method="GET")
         return data["result"]
@@ -62,22 +117,47 @@ class BitrixClient:
         data = await self._request("crm.deal.get", http_method="GET", params={"id": deal_id})
         return data["result"]
 
-    async def list_deals(self, filter_: Dict[str, Any], select: Optional[Iterable[str]] = None, start: int | None = 0) -> List[Dict[str, Any]]:
+    def _list_payload(
+        self, filter_: Dict[str, Any], select: Optional[Iterable[str]] = None, start: int | None = 0
+    ) -> Dict[str, Any]:
         payload: Dict[str, Any] = {"filter": filter_, "order": {"ID": "DESC"}}
         if select:
             payload["select"] = list(select)
         if start is not None:
             payload["start"] = start
-        data = await self._request("crm.deal.list", json=payload)
+        return payload
+
+    async def _batch_lists(
+        self, method: str, filters: List[Dict[str, Any]], select: Optional[Iterable[str]], start: int | None
+    ) -> List[List[Dict[str, Any]] | BitrixError]:
+        results: List[List[Dict[str, Any]] | BitrixError] = []
+        for offset in range(0, len(filters), BATCH_LIMIT):
+            cmd = {
+                f"q{index}": (method, self._list_payload(filter_, select, start))
+                for index, filter_ in enumerate(filters[offset : offset + BATCH_LIMIT], start=offset)
+            }
+            data, errors = await self._batch(cmd)
+            results.extend(errors[key] if key in errors else data.get(key) or [] for key in cmd)
+        return results
+
+    async def list_deals(self, filter_: Dict[str, Any], select: Optional[Iterable[str]] = None, start: int | None = 0) -> List[Dict[str, Any]]:
+        data = await self._request("crm.deal.list", json=self._list_payload(filter_, select, start))
         return data.get("result", [])
 
+    async def list_deals_batch(
+        self, filters: List[Dict[str, Any]], select: Optional[Iterable[str]] = None, start: int | None = 0
+    ) -> List[List[Dict[str, Any]] | BitrixError]:
+        return await self._batch_lists("crm.deal.list", filters, select, start)
+
     async def list_contacts(self, filter_: Dict[str, Any], select: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
-        payload: Dict[str, Any] = {"filter": filter_, "order": {"ID": "DESC"}}
-        if select:
-            payload["select"] = list(select)
-        data = await self._request("crm.contact.list", json=payload)
+        data = await self._request("crm.contact.list", json=self._list_payload(filter_, select, None))
         return data.get("result", [])
 
+    async def list_contacts_batch(
+        self, filters: List[Dict[str, Any]], select: Optional[Iterable[str]] = None
+    ) -> List[List[Dict[str, Any]] | BitrixError]:
+        return await self._batch_lists("crm.contact.list", filters, select, None)
+
     async def get_contact(self, contact_id: int) -> Dict[str, Any]:
         data = await self._request("crm.contact.get", http_method="GET", params={"id": contact_id})
         return data["result"]
@@ -87,17 +167,12 @@ class BitrixClient:
         data = await self._request("crm.contact.add", json=payload)
         return int(data["result"])
 
-    async def ensure_storage_root(self) -> str:
-        if self._root_folder_id:
-            return self._root_folder_id
+    def _storage_command(self) -> Tuple[str, Dict[str, Any]]:
         if settings.bitrix_disk_use_common:
-            data = await self._request("disk.storage.getforcommon", json={})
-        else:
-            data = await self._request(
-                "disk.storage.getforuser",
-                json={"id": settings.bitrix_disk_user_id},
-            )
-        storage = data.get("result")
+            return "disk.storage.getforcommon", {}
+        return "disk.storage.getforuser", {"id": settings.bitrix_disk_user_id}
+
+    def _root_id_from_storage(self, storage: Optional[Dict[str, Any]]) -> str:
         if not storage:
             raise BitrixError("Unable to resolve Bitrix Disk storage for configured scope")
         root_object_id = storage.get("ROOT_OBJECT_ID") or storage.get("rootObjectId")
@@ -105,17 +180,60 @@ class BitrixClient:
             root_object_id = storage["ROOT_OBJECT"].get("ID")
         if not root_object_id:
             raise BitrixError("Unable to resolve Bitrix Disk root folder id from storage response")
-        self._root_folder_id = str(root_object_id)
+        return str(root_object_id)
+
+    def _index_child_folders(self, parent_id: str, entries: Iterable[Dict[str, Any]]) -> Dict[str, str]:
+        folders = {
+            str(entry["NAME"]): str(entry["ID"])
+            for entry in entries
+            if entry.get("TYPE") == "folder" and entry.get("NAME") is not None
+        }
+        for folder_name, folder_id in folders.items():
+            self._folder_cache[f"{parent_id}:{folder_name}"] = folder_id
+        return folders
+
+    async def ensure_storage_root(self) -> str:
+        if self._root_folder_id:
+            return self._root_folder_id
+        method, params = self._storage_command()
+        data = await self._request(method, json=params)
+        self._root_folder_id = self._root_id_from_storage(data.get("result"))
         return self._root_folder_id
 
     async def ensure_uploads_parent(self) -> str:
         if self._uploads_parent_id:
             return self._uploads_parent_id
+        if self._uploads_parent_lock is None:
+            self._uploads_parent_lock = asyncio.Lock()
+        # Concurrent deals must not each create their own uploads folder.
+        async with self._uploads_parent_lock:
+            if self._uploads_parent_id:
+                return self._uploads_parent_id
+            return await self._resolve_uploads_parent()
+
+    async def _resolve_uploads_parent(self) -> str:
         if settings.bitrix_disk_folder_id:
             self._uploads_parent_id = str(settings.bitrix_disk_folder_id)
             return self._uploads_parent_id
+        name = settings.bitrix_disk_root_folder_name
+        if not self._root_folder_id:
+            results, errors = await self._batch(
+                {
+                    "storage": self._storage_command(),
+                    "children": ("disk.folder.getchildren", {"id": "$result[storage][ROOT_OBJECT_ID]"}),
+                }
+            )
+            if errors:
+                results = {}
+            if results.get("storage"):
+                self._root_folder_id = self._root_id_from_storage(results["storage"])
+                folders = self._index_child_folders(self._root_folder_id, results.get("children") or [])
+                folder_id = folders.get(name)
+                if not folder_id:
+                    folder_id = await self._create_folder(self._root_folder_id, name)
+                self._folder_cache[f"{self._root_folder_id}:{name}"] = folder_id
         root_id = await self.ensure_storage_root()
-        folder_id = await self.ensure_folder(root_id, settings.bitrix_disk_root_folder_name)
+        folder_id = await self.ensure_folder(root_id, name)
         self._uploads_parent_id = folder_id
         return folder_id
 
@@ -124,28 +242,52 @@ class BitrixClient:
         if cache_key in self._folder_cache:
             return self._folder_cache[cache_key]
         data = await self._request("disk.folder.getchildren", json={"id": parent_id})
-        for entry in data.get("result", []):
-            if entry.get("TYPE") == "folder" and entry.get("NAME") == name:
-                folder_id = str(entry["ID"])
-                self._folder_cache[cache_key] = folder_id
-                return folder_id
+        folder_id = self._index_child_folders(parent_id, data.get("result", [])).get(name)
+        if folder_id:
+            return folder_id
+        folder_id = await self._create_folder(parent_id, name)
+        self._folder_cache[cache_key] = folder_id
+        return folder_id
+
+    async def _create_folder(self, parent_id: str, name: str) -> str:
         created = await self._request(
             "disk.folder.add",
             json={"data": {"NAME": name, "PARENT_ID": parent_id}},
         )
-        folder_id = str(created["result"]["ID"])
-        self._folder_cache[cache_key] = folder_id
-        return folder_id
+        return str(created["result"]["ID"])
 
     async def upload_file(self, folder_id: str, file_path: Path) -> str:
-        with file_path.open("rb") as handle:
-            files = {"file": (file_path.name, handle, "application/octet-stream")}
-            data = await self._request(
-                "disk.folder.uploadfile",
-                data={"id": folder_id, "generateUniqueName": "true"},
-                files=files,
-            )
-        return str(data["result"]["ID"])
+        boundary = uuid.uuid4().hex
+        fields = {"id": folder_id, "generateUniqueName": "true"}
+        head = b"".join(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8")
+            for name, value in fields.items()
+        )
+        filename = file_path.name.replace("\\", "\\\\").replace('"', "%22")
+        head += (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n"
+        ).encode("utf-8")
+        tail = f"\r\n--{boundary}--\r\n".encode("utf-8")
+        size = (await asyncio.to_thread(file_path.stat)).st_size
+
+        async def body() -> AsyncIterator[bytes]:
+            yield head
+            handle = await asyncio.to_thread(file_path.open, "rb")
+            try:
+                while chunk := await asyncio.to_thread(handle.read, UPLOAD_CHUNK_SIZE):
+                    yield chunk
+            finally:
+                handle.close()
+            yield tail
 
+        data = await self._request(
+            "disk.folder.uploadfile",
+            content=body(),
+            headers={
+                "Content-Type": f"multipart/form-data; boundary={boundary}",
+                "Content-Length": str(len(head) + size + len(tail)),
+            },
+        )
+        return str(data["result"]["ID"])
 
-bitrix_client = BitrixClient()
@@ -13,11 +13,18 @@ class Settings(BaseSettings):
     tilda_public_key: Optional[str] = None
     tilda_secret_key: Optional[str] = None
     tilda_project_id: Optional[int] = None
+    tilda_form_cache_seconds: float = 300.0
     mapping_file: Path = Path("mapping.json")
+    mapping_check_interval_seconds: float = 5.0
     log_file: Path = Path("data/events.log")
     bitrix_fields_cache: Path = Path("data/bitrix_fields.json")
     request_timeout_seconds: float = 15.0
+    bitrix_pool_max: int = 20
+    bitrix_pool_keepalive: int = 10
+    bitrix_max_concurrent: int = 8
     upload_temp_dir: Path = Path("data/tmp_uploads")
+    upload_image_max_side: int = 2048
+    upload_image_skip_jpeg_bytes: int = 300_000
     bitrix_category_base_id: int = 6
     bitrix_category_applications_id: int = 8
     bitrix_category_secondary_id: int = 12
@@ -1,18 +1,70 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import logging
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
+
+import orjson
 
 from .config import settings
 
+LOG_BATCH_SIZE = 500
+
+_queue: Optional[asyncio.Queue[Optional[bytes]]] = None
+_writer_task: Optional[asyncio.Task[None]] = None
+
 
 def _ensure_parent(path: Path) -> None:
     if not path.parent.exists():
         path.parent.mkdir(parents=True, exist_ok=True)
 
 
+def _append_lines(lines: List[bytes]) -> None:
+    log_path = settings.log_file
+    _ensure_parent(log_path)
+    with log_path.open("ab") as handle:
+        handle.write(b"".join(lines))
+
+
+async def _log_writer(queue: asyncio.Queue[Optional[bytes]]) -> None:
+    running = True
+    while running:
+        line = await queue.get()
+        if line is None:
+            break
+        lines = [line]
+        while len(lines) < LOG_BATCH_SIZE and not queue.empty():
+            line = queue.get_nowait()
+            if line is None:
+                running = False
+                break
+            lines.append(line)
+        try:
+            await asyncio.to_thread(_append_lines, lines)
+        except Exception as exc:  # pragma: no cover - disk errors only logged
+            logging.getLogger("bitrix_tilda").exception("Failed to write %d log entries: %s", len(lines), exc)
+
+
+def start_log_writer() -> None:
+    global _queue, _writer_task
+    if _writer_task is not None:
+        return
+    _queue = asyncio.Queue()
+    _writer_task = asyncio.create_task(_log_writer(_queue))
+
+
+async def stop_log_writer() -> None:
+    global _queue, _writer_task
+    if _queue is None or _writer_task is None:
+        return
+    queue, task = _queue, _writer_task
+    _queue, _writer_task = None, None
+    queue.put_nowait(None)
+    await task
+
+
 def write_log_entry(
     *,
     source: str,
@@ -33,7 +85,8 @@ def write_log_entry(
     if extra:
         entry.update(extra)
 
-    log_path = settings.log_file
-    _ensure_parent(log_path)
-    with log_path.open("a", encoding="utf-8") as handle:
-        handle.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    line = orjson.dumps(entry) + b"\n"
+    if _queue is not None:
+        _queue.put_nowait(line)
+        return
+    _append_lines([line])
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
 import os
 import re
@@ -10,25 +10,35 @@ import uuid
 from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, BinaryIO, Collection, Dict, Iterable, List, Mapping, Optional, TypeVar
 from urllib.parse import unquote, urlparse
 
 import httpx
+import orjson
 from fastapi import BackgroundTasks, FastAPI, HTTPException, Query, Request, status
 from fastapi.responses import JSONResponse
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
 from starlette.datastructures import FormData, UploadFile
 
 from PIL import Image
 
-from .bitrix import BitrixError, bitrix_client
+from .bitrix import BitrixClient, BitrixError
 from .config import settings
-from .logger import write_log_entry
-from .mapping import FormMapping, mapping_store
-from .tilda import TildaError, tilda_client
+from .logger import start_log_writer, stop_log_writer, write_log_entry
+from .mapping import FormMapping, get_mapping_store
+from .tilda import TildaError, close_tilda_client, get_tilda_client
+
+T = TypeVar("T")
 
 logger = logging.getLogger("bitrix_tilda")
 logging.basicConfig(level=logging.INFO)
 
+bitrix_client: BitrixClient | None = None
+outbound_client: httpx.AsyncClient | None = None
+_FIELDS_CACHE: tuple[float, Dict[str, Any]] | None = None
+_fields_cache_dir_ready = False
+
 
 @dataclass
 class SavedUpload:
@@ -39,6 +49,15 @@ class SavedUpload:
     compressed: bool = False
 
 
+@dataclass
+class ParsedForm:
+    payload: Dict[str, Any]
+    uploads: List[SavedUpload]
+    form_keys: Dict[str, str]
+    raw_body: Optional[bytes] = None
+    raw_body_path: Optional[str] = None
+
+
 @dataclass
 class SearchValues:
     inn: Optional[str]
@@ -47,30 +66,50 @@ class SearchValues:
     emails: List[str]
 
 
+def _write_fields_cache(cache_path: Path, fields: Dict[str, Any]) -> None:
+    global _fields_cache_dir_ready
+    if not _fields_cache_dir_ready:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        _fields_cache_dir_ready = True
+    cache_path.write_bytes(orjson.dumps(fields, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+
+
 async def cache_bitrix_fields() -> None:
+    global _FIELDS_CACHE
     fields = await bitrix_client.fetch_deal_fields()
     cache_path = settings.bitrix_fields_cache
-    cache_path.parent.mkdir(parents=True, exist_ok=True)
-    with cache_path.open("w", encoding="utf-8") as handle:
-        json.dump(fields, handle, ensure_ascii=False, indent=2)
+    await asyncio.to_thread(_write_fields_cache, cache_path, fields)
+    _FIELDS_CACHE = None
     logger.info("Saved Bitrix24 deal field structure to %s", cache_path)
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
+    global bitrix_client, outbound_client
+    bitrix_client = BitrixClient()
+    outbound_client = httpx.AsyncClient(
+        timeout=settings.request_timeout_seconds,
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=50, keepalive_expiry=30),
+    )
+    start_log_writer()
     try:
         await cache_bitrix_fields()
     except Exception as exc:  # pragma: no cover - startup diagnostics
         logger.exception("Failed to cache Bitrix fields: %s", exc)
     yield
+    await outbound_client.aclose()
+    outbound_client = None
+    await stop_log_writer()
     await bitrix_client.close()
-    await tilda_client.close()
+    bitrix_client = None
+    await close_tilda_client()
 
 
 app = FastAPI(title="Tilda ↔ Bitrix24 Bridge", lifespan=lifespan)
 
 
-FORM_IDENTIFIER_KEYS = (
+_FORM_KEY_PRIORITY = (
     "formname",
     "formid",
     "tildaformid",
@@ -79,10 +118,19 @@ FORM_IDENTIFIER_KEYS = (
     "form_id",
     "lable",
 )
+FORM_IDENTIFIER_KEYS = frozenset(_FORM_KEY_PRIORITY)
 DEFAULT_PARTICIPATION_FIELD = "format"
-DEFAULT_FILE_FIELD_MAP = {
-    "Показ": settings.bitrix_show_file_field,
-    "Маркет": settings.bitrix_market_file_field,
+BASE_DEAL_FILTER = {"CATEGORY_ID": settings.bitrix_category_base_id}
+BASE_DEAL_COMPANY_FIELDS = settings.bitrix_company_fields or (settings.bitrix_title_field,)
+DEAL_SEARCH_SELECT = ("ID", "COMPANY_ID", "CONTACT_ID")
+CONTACT_SEARCH_SELECT = ("ID", "COMPANY_ID")
+APPLICATION_DEAL_BASE_FIELDS = {
+    "CATEGORY_ID": settings.bitrix_category_applications_id,
+    "STAGE_ID": settings.bitrix_stage_applications_new,
+}
+SECONDARY_DEAL_BASE_FIELDS = {
+    "CATEGORY_ID": settings.bitrix_category_secondary_id,
+    "STAGE_ID": settings.bitrix_stage_secondary_new,
 }
 COMPRESSION_FIELDS = {"illustrations_show", "illustrations_market"}
 FILE_TARGET_FIELDS = {
@@ -91,6 +139,16 @@ FILE_TARGET_FIELDS = {
     "linesheet": settings.bitrix_linesheet_file_field,
 }
 REMOTE_FILE_FIELDS = set(FILE_TARGET_FIELDS.keys())
+UPLOAD_COPY_BUFFER = 1024 * 1024
+# Starlette's max_files/max_fields defaults for request.form().
+MULTIPART_MAX_FILES = 1000
+MULTIPART_MAX_FIELDS = 1000
+_SAFE_NAME_RE = re.compile(r"[^\w.\-]+")
+_URL_SPLIT_RE = re.compile(r"[\n,;]+")
+_PHONE_RE = re.compile(r"[^0-9+]")
+_PARTICIPATION_DELIMITERS = str.maketrans({";": "\n"})
+FORWARD_FIELDS = frozenset(settings.b24_forward_fields)
+PARTICIPATION_KEYWORDS = tuple((keyword.lower(), keyword) for keyword in settings.participation_keywords)
 PARTICIPATION_ALIASES = {
     "маркет/шоурум": "Маркет / Шоурум",
     "маркет / шоурум": "Маркет / Шоурум",
@@ -106,15 +164,25 @@ def create_temp_directory() -> Path:
     return Path(tempfile.mkdtemp(prefix="tilda_", dir=settings.upload_temp_dir))
 
 
+JPEG_MAGIC = b"\xff\xd8\xff"
+
+
 def compress_image_inplace(path: Path) -> bool:
     try:
+        if os.stat(path).st_size < settings.upload_image_skip_jpeg_bytes:
+            with path.open("rb") as handle:
+                if handle.read(len(JPEG_MAGIC)) == JPEG_MAGIC:
+                    return False
         image = Image.open(path)
     except Exception:
         return False
     try:
         image = image.convert("RGB")
+        if settings.upload_image_max_side > 0:
+            max_side = settings.upload_image_max_side
+            image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
         temp_path = path.with_suffix(".tmp.jpg")
-        image.save(temp_path, format="JPEG", optimize=True, quality=85)
+        image.save(temp_path, format="JPEG", optimize=True, quality=85, progressive=True, subsampling=2)
         image.close()
         original_name = path.name
         os.replace(temp_path, path)
@@ -123,40 +191,234 @@ def compress_image_inplace(path: Path) -> bool:
         return False
 
 
+def _copy_upload(source: BinaryIO, target: Path) -> None:
+    with target.open("wb", buffering=UPLOAD_COPY_BUFFER) as handle:
+        shutil.copyfileobj(source, handle, UPLOAD_COPY_BUFFER)
+
+
 async def persist_upload(field: str, upload: UploadFile, destination: Path) -> SavedUpload:
     filename = upload.filename or f"upload_{uuid.uuid4().hex}"
-    safe_name = re.sub(r"[^\w.\-]+", "_", Path(filename).name)
+    safe_name = _SAFE_NAME_RE.sub("_", Path(filename).name)
     target = destination / safe_name
-    with target.open("wb") as handle:
-        while True:
-            chunk = await upload.read(1024 * 1024)
-            if not chunk:
-                break
-            handle.write(chunk)
+    await asyncio.to_thread(_copy_upload, upload.file, target)
     await upload.close()
     compressed = False
     if field in COMPRESSION_FIELDS:
-        compressed = compress_image_inplace(target)
+        compressed = await asyncio.to_thread(compress_image_inplace, target)
     return SavedUpload(field=field, filename=safe_name, path=target, content_type=upload.content_type, compressed=compressed)
 
 
-async def parse_form_data(form: FormData, temp_dir: Path) -> tuple[Dict[str, Any], List[SavedUpload]]:
-    payload: Dict[str, Any] = {}
+async def parse_form_data(
+    form: FormData,
+    temp_dir: Path,
+    *,
+    upload_fields: Optional[Collection[str]] = None,
+) -> tuple[Dict[str, Any], List[SavedUpload], Dict[str, str]]:
+    fields: Dict[str, List[str]] = {}
     uploads: List[SavedUpload] = []
     for key, value in form.multi_items():
         if isinstance(value, UploadFile):
+            if upload_fields is not None and key not in upload_fields:
+                await value.close()
+                continue
             saved = await persist_upload(key, value, temp_dir)
             uploads.append(saved)
             continue
-        if key in payload:
-            existing = payload[key]
-            if isinstance(existing, list):
-                existing.append(value)
-            else:
-                payload[key] = [existing, value]
+        fields.setdefault(key, []).append(value)
+    payload, form_keys = build_form_payload(fields)
+    return payload, uploads, form_keys
+
+
+def build_form_payload(fields: Dict[str, List[str]]) -> tuple[Dict[str, Any], Dict[str, str]]:
+    payload: Dict[str, Any] = {key: values[0] if len(values) == 1 else values for key, values in fields.items()}
+    form_keys: Dict[str, str] = {}
+    for key in FORM_IDENTIFIER_KEYS & payload.keys():
+        value = payload[key]
+        if type(value) is str and value.strip():
+            form_keys[key] = value.strip()
+    return payload, form_keys
+
+
+def _decode_part(value: bytes, charset: str) -> str:
+    try:
+        return value.decode(charset)
+    except (UnicodeDecodeError, LookupError):
+        return value.decode("latin-1")
+
+
+class MultipartStream:
+    def __init__(
+        self,
+        boundary: bytes,
+        charset: str,
+        temp_dir: Path,
+        upload_fields: Optional[Collection[str]] = None,
+    ) -> None:
+        self.items: List[tuple[str, str | SavedUpload]] = []
+        self.raw_body_path: Optional[Path] = None
+        self._charset = charset
+        self._temp_dir = temp_dir
+        self._upload_fields = upload_fields
+        self._raw_handle: Optional[BinaryIO] = None
+        self._header_name = b""
+        self._header_value = b""
+        self._headers: Dict[bytes, bytes] = {}
+        self._field_name = ""
+        self._data = bytearray()
+        self._upload: Optional[SavedUpload] = None
+        self._handle: Optional[BinaryIO] = None
+        self._is_file = False
+        self._files = 0
+        self._fields = 0
+        self._parser = MultipartParser(
+            boundary,
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+            },
+        )
+
+    def feed(self, chunk: bytes) -> None:
+        if self._raw_handle is None:
+            self.raw_body_path = _new_raw_body_path()
+            self._raw_handle = self.raw_body_path.open("wb")
+        self._raw_handle.write(chunk)
+        self._parser.write(chunk)
+
+    def finish(self) -> None:
+        self._parser.finalize()
+        self.close()
+
+    def discard(self) -> None:
+        self.close()
+        if self.raw_body_path is not None:
+            self.raw_body_path.unlink(missing_ok=True)
+            self.raw_body_path = None
+
+    def close(self) -> None:
+        for handle in (self._handle, self._raw_handle):
+            if handle is not None:
+                handle.close()
+        self._handle = None
+        self._raw_handle = None
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+        self._data = bytearray()
+        self._upload = None
+        self._is_file = False
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_name.lower()] = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if b"name" not in options:
+            raise MultipartParseError('The Content-Disposition header field "name" must be provided.')
+        self._field_name = _decode_part(options[b"name"], self._charset)
+        self._is_file = b"filename" in options
+        if not self._is_file:
+            self._fields += 1
+            if self._fields > MULTIPART_MAX_FIELDS:
+                raise MultipartParseError(f"Too many fields. Maximum number of fields is {MULTIPART_MAX_FIELDS}.")
+            return
+        self._files += 1
+        if self._files > MULTIPART_MAX_FILES:
+            raise MultipartParseError(f"Too many files. Maximum number of files is {MULTIPART_MAX_FILES}.")
+        if self._upload_fields is not None and self._field_name not in self._upload_fields:
+            return
+        filename = _decode_part(options[b"filename"], self._charset) or f"upload_{uuid.uuid4().hex}"
+        safe_name = _SAFE_NAME_RE.sub("_", Path(filename).name)
+        content_type = self._headers.get(b"content-type")
+        self._upload = SavedUpload(
+            field=self._field_name,
+            filename=safe_name,
+            path=self._temp_dir / safe_name,
+            content_type=content_type.decode("latin-1") if content_type else None,
+        )
+        self._handle = self._upload.path.open("wb", buffering=UPLOAD_COPY_BUFFER)
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if not self._is_file:
+            self._data += data[start:end]
+        elif self._handle is not None:
+            self._handle.write(data[start:end])
+
+    def _on_part_end(self) -> None:
+        if not self._is_file:
+            self.items.append((self._field_name, _decode_part(bytes(self._data), self._charset)))
+            return
+        if self._handle is not None and self._upload is not None:
+            self._handle.close()
+            self._handle = None
+            self.items.append((self._field_name, self._upload))
+
+
+async def stream_form_data(
+    request: Request,
+    temp_dir: Path,
+    *,
+    upload_fields: Optional[Collection[str]] = None,
+) -> ParsedForm:
+    _, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing boundary in multipart.")
+    charset = params.get(b"charset", b"utf-8").decode("latin-1")
+    stream = MultipartStream(boundary, charset, temp_dir, upload_fields)
+    try:
+        async for chunk in request.stream():
+            if chunk:
+                await asyncio.to_thread(stream.feed, chunk)
+        await asyncio.to_thread(stream.finish)
+    except MultipartParseError as exc:
+        stream.discard()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    except BaseException:
+        stream.discard()
+        raise
+    finally:
+        stream.close()
+
+    fields: Dict[str, List[str]] = {}
+    uploads: List[SavedUpload] = []
+    for key, value in stream.items:
+        if isinstance(value, SavedUpload):
+            if key in COMPRESSION_FIELDS:
+                value.compressed = await asyncio.to_thread(compress_image_inplace, value.path)
+            uploads.append(value)
         else:
-            payload[key] = value
-    return payload, uploads
+            fields.setdefault(key, []).append(value)
+    payload, form_keys = build_form_payload(fields)
+    raw_body_path = str(stream.raw_body_path) if stream.raw_body_path else None
+    return ParsedForm(payload=payload, uploads=uploads, form_keys=form_keys, raw_body_path=raw_body_path)
+
+
+async def read_tilda_form(
+    request: Request,
+    temp_dir: Path,
+    *,
+    upload_fields: Optional[Collection[str]] = None,
+) -> ParsedForm:
+    if request.headers.get("content-type", "").lower().startswith("multipart/form-data"):
+        return await stream_form_data(request, temp_dir, upload_fields=upload_fields)
+    raw_body = await _read_raw_body(request)
+    form = await request.form()
+    payload, uploads, form_keys = await parse_form_data(form, temp_dir, upload_fields=upload_fields)
+    return ParsedForm(payload=payload, uploads=uploads, form_keys=form_keys, raw_body=raw_body)
 
 
 def extract_remote_urls(value: Any) -> List[str]:
@@ -172,7 +434,7 @@ def extract_remote_urls(value: Any) -> List[str]:
             urls.extend(extract_remote_urls(item))
             continue
         text = str(item)
-        candidates = re.split(r"[\n,;]+", text)
+        candidates = _URL_SPLIT_RE.split(text)
         for candidate in candidates:
             candidate = candidate.strip()
             if candidate.lower().startswith("http://") or candidate.lower().startswith("https://"):
@@ -196,13 +458,13 @@ async def download_remote_files(payload: Dict[str, Any], temp_dir: Path) -> List
                     logger.warning("Failed to download remote file %s: %s", url, exc)
                     continue
                 filename = Path(unquote(urlparse(url).path)).name or f"remote_{uuid.uuid4().hex}"
-                safe_name = re.sub(r"[^\w.\-]+", "_", filename)
+                safe_name = _SAFE_NAME_RE.sub("_", filename)
                 target = temp_dir / safe_name
                 with target.open("wb") as handle:
                     handle.write(response.content)
                 compressed = False
                 if field in COMPRESSION_FIELDS:
-                    compressed = compress_image_inplace(target)
+                    compressed = await asyncio.to_thread(compress_image_inplace, target)
                 tasks.append(
                     SavedUpload(
                         field=field,
@@ -215,13 +477,16 @@ async def download_remote_files(payload: Dict[str, Any], temp_dir: Path) -> List
     return tasks
 
 
+def _new_raw_body_path() -> Path:
+    raw_dir = settings.upload_temp_dir / "raw"
+    raw_dir.mkdir(parents=True, exist_ok=True)
+    return raw_dir / f"raw_{uuid.uuid4().hex}.bin"
+
+
 def save_raw_body(raw_body: Optional[bytes]) -> Optional[str]:
     if not raw_body:
         return None
-    raw_dir = settings.upload_temp_dir / "raw"
-    raw_dir.mkdir(parents=True, exist_ok=True)
-    filename = f"raw_{uuid.uuid4().hex}.bin"
-    path = raw_dir / filename
+    path = _new_raw_body_path()
     try:
         with path.open("wb") as handle:
             handle.write(raw_body)
@@ -230,29 +495,39 @@ def save_raw_body(raw_body: Optional[bytes]) -> Optional[str]:
         return None
 
 
+def discard_raw_body(raw_body_path: Optional[str]) -> None:
+    if raw_body_path:
+        Path(raw_body_path).unlink(missing_ok=True)
+
+
 def normalize_form_key(name: str) -> str:
     return FORM_KEY_ALIASES.get(name, name)
 
 
-def detect_form_key(payload: Dict[str, Any], forced: Optional[str] = None) -> str:
+def detect_form_key(form_keys: Dict[str, str], forced: Optional[str] = None) -> str:
     if forced:
         return normalize_form_key(forced)
-    for key in FORM_IDENTIFIER_KEYS:
-        value = payload.get(key)
-        if isinstance(value, str) and value.strip():
-            return normalize_form_key(value.strip())
+    if form_keys:
+        for key in _FORM_KEY_PRIORITY:
+            value = form_keys.get(key)
+            if value:
+                return normalize_form_key(value)
     raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot determine Tilda form identifier")
 
 
 def normalize_value(value: Any) -> Optional[Any]:
-    if value is None:
-        return None
-    if isinstance(value, str):
+    value_type = type(value)
+    if value_type is str:
         stripped = value.strip()
         return stripped if stripped else None
-    if isinstance(value, list):
-        normalized_list = [normalize_value(item) for item in value]
-        normalized_list = [item for item in normalized_list if item not in (None, "", [])]
+    if value is None:
+        return None
+    if value_type is list:
+        normalized_list = []
+        for item in value:
+            normalized = normalize_value(item)
+            if normalized is not None:
+                normalized_list.append(normalized)
         return normalized_list or None
     return value
 
@@ -260,12 +535,14 @@ def normalize_value(value: Any) -> Optional[Any]:
 async def forward_to_external(payload: Dict[str, Any]) -> None:
     if not settings.b24_outbound_webhook_url:
         return
-    if settings.b24_forward_fields:
-        payload = {field: payload.get(field) for field in settings.b24_forward_fields if field in payload}
+    if FORWARD_FIELDS:
+        payload = {key: value for key, value in payload.items() if key in FORWARD_FIELDS}
+    if outbound_client is None:
+        logger.warning("Outbound HTTP client is not initialised, skipping Bitrix webhook forwarding")
+        return
     try:
-        async with httpx.AsyncClient(timeout=settings.request_timeout_seconds) as client:
-            response = await client.post(settings.b24_outbound_webhook_url, json=payload)
-            response.raise_for_status()
+        response = await outbound_client.post(settings.b24_outbound_webhook_url, json=payload)
+        response.raise_for_status()
     except Exception as exc:  # pragma: no cover - background task
         logger.exception("Failed to forward Bitrix webhook: %s", exc)
 
@@ -273,13 +550,11 @@ async def forward_to_external(payload: Dict[str, Any]) -> None:
 def extract_first(payload: Dict[str, Any], keys: tuple[str, ...]) -> Optional[str]:
     for key in keys:
         value = normalize_value(payload.get(key))
-        if isinstance(value, list):
-            if value:
-                entry = normalize_value(value[0])
-                if entry:
-                    return str(entry)
-        elif value is not None:
-            return str(value)
+        if value is None:
+            continue
+        if type(value) is list:
+            return str(value[0])
+        return str(value)
     return None
 
 
@@ -297,7 +572,7 @@ def extract_list(payload: Dict[str, Any], keys: tuple[str, ...]) -> List[str]:
 
 
 def normalize_phone(value: str) -> str:
-    digits = re.sub(r"[^0-9+]", "", value)
+    digits = _PHONE_RE.sub("", value)
     digits = digits.replace("+7", "7", 1) if digits.startswith("+7") else digits
     if digits.startswith("8") and len(digits) == 11:
         digits = "7" + digits[1:]
@@ -312,40 +587,35 @@ def build_search_values(mapping: FormMapping, payload: Dict[str, Any]) -> Search
     return SearchValues(inn=inn, company=company, phones=phones, emails=emails)
 
 
-def get_uploads_for_field(uploads: List[SavedUpload], field_name: str) -> List[SavedUpload]:
-    return [upload for upload in uploads if upload.field == field_name]
+def index_uploads_by_field(uploads: List[SavedUpload]) -> Dict[str, List[SavedUpload]]:
+    uploads_by_field: Dict[str, List[SavedUpload]] = {}
+    for upload in uploads:
+        uploads_by_field.setdefault(upload.field, []).append(upload)
+    return uploads_by_field
 
 
-async def find_existing_contact(search: SearchValues) -> Optional[Dict[str, Any]]:
-    for phone in search.phones:
-        contacts = await bitrix_client.list_contacts({"PHONE": phone}, select=["ID", "COMPANY_ID"])
-        if contacts:
-            contact = contacts[0]
-            contact_detail = await bitrix_client.get_contact(int(contact["ID"]))
-            return contact_detail
-    for email in search.emails:
-        contacts = await bitrix_client.list_contacts({"EMAIL": email}, select=["ID", "COMPANY_ID"])
-        if contacts:
-            contact = contacts[0]
-            contact_detail = await bitrix_client.get_contact(int(contact["ID"]))
-            return contact_detail
-    if search.company:
-        contact = await find_contact_by_company(search.company)
-        if contact:
-            return contact
+def _first_hit(results: List[List[Dict[str, Any]] | BitrixError]) -> Optional[Dict[str, Any]]:
+    # Only a failure ahead of the first match matters; later queries were never needed.
+    for items in results:
+        if isinstance(items, BitrixError):
+            raise items
+        if items:
+            return items[0]
     return None
 
 
-async def find_contact_by_company(company: str) -> Optional[Dict[str, Any]]:
-    normalized = company.strip()
-    if not normalized:
+async def find_existing_contact(search: SearchValues) -> Optional[Dict[str, Any]]:
+    # Filters are listed in order of preference: phone, e-mail, then company name.
+    filters: List[Dict[str, Any]] = [{"PHONE": phone} for phone in search.phones]
+    filters.extend({"EMAIL": email} for email in search.emails)
+    company = search.company.strip() if search.company else ""
+    if company:
+        filters.extend({field: company} for field in settings.contact_company_fields or ())
+    if not filters:
         return None
-    for field in settings.contact_company_fields or ():
-        contacts = await bitrix_client.list_contacts({field: normalized}, select=["ID", "COMPANY_ID"])
-        if contacts:
-            contact = contacts[0]
-            contact_detail = await bitrix_client.get_contact(int(contact["ID"]))
-            return contact_detail
+    contact = _first_hit(await bitrix_client.list_contacts_batch(filters, select=CONTACT_SEARCH_SELECT))
+    if contact:
+        return await bitrix_client.get_contact(int(contact["ID"]))
     return None
 
 
@@ -397,42 +667,29 @@ async def ensure_contact(mapping: FormMapping, payload: Dict[str, Any], search:
 
 
 async def find_base_deal(search: SearchValues) -> Optional[Dict[str, Any]]:
-    base_filter = {"CATEGORY_ID": settings.bitrix_category_base_id}
+    filters: List[Dict[str, Any]] = []
     if search.inn:
-        inn_filter = base_filter | {settings.bitrix_inn_field: search.inn}
-        deals = await bitrix_client.list_deals(inn_filter, select=["ID", "COMPANY_ID", "CONTACT_ID"])
-        if deals:
-            return deals[0]
+        filters.append(BASE_DEAL_FILTER | {settings.bitrix_inn_field: search.inn})
     if search.company:
-        for field in settings.bitrix_company_fields or (settings.bitrix_title_field,):
-            company_filter = dict(base_filter)
-            company_filter[field] = search.company
-            deals = await bitrix_client.list_deals(company_filter, select=["ID", "COMPANY_ID", "CONTACT_ID"])
-            if deals:
-                return deals[0]
+        filters.extend(BASE_DEAL_FILTER | {field: search.company} for field in BASE_DEAL_COMPANY_FIELDS)
+    if filters:
+        deal = _first_hit(await bitrix_client.list_deals_batch(filters, select=DEAL_SEARCH_SELECT))
+        if deal:
+            return deal
     if search.phones or search.emails or search.company:
         contact = await find_existing_contact(search)
         if contact:
-            contact_deals = await bitrix_client.list_deals(
-                {"CATEGORY_ID": settings.bitrix_category_base_id, "CONTACT_ID": contact["ID"]},
-                select=["ID", "COMPANY_ID", "CONTACT_ID"],
-            )
-            if contact_deals:
-                return contact_deals[0]
+            contact_filters = [BASE_DEAL_FILTER | {"CONTACT_ID": contact["ID"]}]
             company_id = contact.get("COMPANY_ID")
             if company_id:
-                company_deals = await bitrix_client.list_deals(
-                    {"CATEGORY_ID": settings.bitrix_category_base_id, "COMPANY_ID": company_id},
-                    select=["ID", "COMPANY_ID", "CONTACT_ID"],
-                )
-                if company_deals:
-                    return company_deals[0]
+                contact_filters.append(BASE_DEAL_FILTER | {"COMPANY_ID": company_id})
+            return _first_hit(await bitrix_client.list_deals_batch(contact_filters, select=DEAL_SEARCH_SELECT))
     return None
 
 
 def build_deal_fields(
     form_payload: Dict[str, Any],
-    mapping: Dict[str, str],
+    mapping: Mapping[str, str],
     *,
     base_fields: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
@@ -462,6 +719,7 @@ def extract_participation_types(form_mapping: FormMapping, payload: Dict[str, An
     field_name = form_mapping.participation_field or DEFAULT_PARTICIPATION_FIELD
     raw_value = payload.get(field_name)
     values: List[str] = []
+    seen: set[str] = set()
     tokens: List[str] = []
     if isinstance(raw_value, list):
         tokens = [str(item) for item in raw_value if item]
@@ -470,29 +728,38 @@ def extract_participation_types(form_mapping: FormMapping, payload: Dict[str, An
     for token in tokens:
         alias_key = token.strip().lower()
         if alias_key in PARTICIPATION_ALIASES:
-            values.append(PARTICIPATION_ALIASES[alias_key])
+            alias = PARTICIPATION_ALIASES[alias_key]
+            seen.add(alias)
+            values.append(alias)
             continue
-        parts = re.split(r"[;\n]+", token)
+        parts = token.translate(_PARTICIPATION_DELIMITERS).split("\n")
         for part in parts:
             cleaned = part.strip()
             if not cleaned:
                 continue
-            for keyword in settings.participation_keywords:
-                if keyword.lower() in cleaned.lower():
-                    if keyword not in values:
-                        values.append(keyword)
+            cleaned_lower = cleaned.lower()
+            for keyword_lower, keyword in PARTICIPATION_KEYWORDS:
+                if keyword_lower in cleaned_lower and keyword not in seen:
+                    seen.add(keyword)
+                    values.append(keyword)
     return values
 
 
+async def gather_all(awaitables: Iterable[Awaitable[T]]) -> List[T]:
+    # Let every call finish before re-raising, so nothing outlives the request's temp files.
+    results = await asyncio.gather(*awaitables, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results  # type: ignore[return-value]
+
+
 async def upload_files_for_deal(deal_id: int, uploads: List[SavedUpload], target_field: Optional[str]) -> List[str]:
     if not uploads or not target_field:
         return []
     parent = await bitrix_client.ensure_uploads_parent()
     folder = await bitrix_client.ensure_folder(parent, f"deal_{deal_id}")
-    file_ids: List[str] = []
-    for upload in uploads:
-        file_id = await bitrix_client.upload_file(folder, upload.path)
-        file_ids.append(file_id)
+    file_ids: List[str] = await gather_all(bitrix_client.upload_file(folder, upload.path) for upload in uploads)
     if file_ids:
         await bitrix_client.update_deal(deal_id, {target_field: file_ids})
     return file_ids
@@ -523,41 +790,40 @@ async def handle_primary_form(
         raise HTTPException(status_code=400, detail="No participation formats were provided")
 
     contact_id, company_id = await ensure_contact(mapping, payload, search_values)
-    created_deals: List[int] = []
-    file_fields = {**DEFAULT_FILE_FIELD_MAP, **mapping.file_field_map}
+    file_fields = mapping.effective_file_fields
+    uploads_by_field = index_uploads_by_field(uploads)
     company_label = search_values.company or payload.get("brands_name") or "Без названия"
+    deal_template = build_deal_fields(
+        payload,
+        mapping.deal_fields,
+        base_fields={**APPLICATION_DEAL_BASE_FIELDS, "SOURCE_ID": form_key},
+    )
 
-    for entry in participation:
-        base_fields = {
-            "CATEGORY_ID": settings.bitrix_category_applications_id,
-            "STAGE_ID": settings.bitrix_stage_applications_new,
-            "SOURCE_ID": form_key,
-        }
-        deal_fields = build_deal_fields(payload, mapping.deal_fields, base_fields=base_fields)
+    async def create_application_deal(entry: str) -> int:
+        deal_fields = dict(deal_template)
         deal_fields[settings.bitrix_title_field] = f"Заявка: {company_label} — {entry}"
         if company_id:
             deal_fields.setdefault("COMPANY_ID", company_id)
         if contact_id:
             deal_fields["CONTACT_ID"] = contact_id
         deal_id = await bitrix_client.create_deal(deal_fields)
-        created_deals.append(deal_id)
         file_summary: Dict[str, List[str]] = {}
         target_field = file_fields.get(entry)
         if entry == "Показ" and target_field:
-            show_uploads = get_uploads_for_field(uploads, "illustrations_show")
+            show_uploads = uploads_by_field.get("illustrations_show", [])
             ids = await upload_files_for_deal(deal_id, show_uploads, target_field)
             if ids:
                 file_summary["illustrations_show"] = ids
         if entry in ("Маркет", "Шоурум"):
             market_field = file_fields.get("Маркет")
-            market_uploads = get_uploads_for_field(uploads, "illustrations_market")
+            market_uploads = uploads_by_field.get("illustrations_market", [])
             ids = await upload_files_for_deal(deal_id, market_uploads, market_field)
             if ids:
                 file_summary["illustrations_market"] = ids
         linesheet_field = mapping.file_field_map.get("linesheet") if mapping.file_field_map else None
         if not linesheet_field:
             linesheet_field = settings.bitrix_linesheet_file_field
-        linesheet_uploads = get_uploads_for_field(uploads, "linesheet")
+        linesheet_uploads = uploads_by_field.get("linesheet", [])
         linesheet_ids = await upload_files_for_deal(deal_id, linesheet_uploads, linesheet_field)
         if linesheet_ids:
             file_summary["linesheet"] = linesheet_ids
@@ -573,6 +839,9 @@ async def handle_primary_form(
                 "raw_body_path": raw_body_path,
             },
         )
+        return deal_id
+
+    created_deals = await gather_all(create_application_deal(entry) for entry in participation)
 
     return {"status": "created", "deal_ids": created_deals}
 
@@ -586,12 +855,11 @@ async def handle_secondary_form(
 ) -> Dict[str, Any]:
     search_values = build_search_values(mapping, payload)
     contact_id, company_id = await ensure_contact(mapping, payload, search_values)
-    base_fields = {
-        "CATEGORY_ID": settings.bitrix_category_secondary_id,
-        "STAGE_ID": settings.bitrix_stage_secondary_new,
-        "SOURCE_ID": form_key,
-    }
-    deal_fields = build_deal_fields(payload, mapping.deal_fields, base_fields=base_fields)
+    deal_fields = build_deal_fields(
+        payload,
+        mapping.deal_fields,
+        base_fields={**SECONDARY_DEAL_BASE_FIELDS, "SOURCE_ID": form_key},
+    )
     company_label = search_values.company or payload.get("brands_name") or "Без названия"
     deal_fields[settings.bitrix_title_field] = f"Заявка: {company_label}"
     if company_id:
@@ -609,73 +877,132 @@ async def handle_secondary_form(
     return {"status": "created", "deal_id": deal_id}
 
 
-async def process_tilda_request(request: Request, forced_form_key: Optional[str] = None) -> JSONResponse:
-    temp_dir = create_temp_directory()
-    raw_body: bytes | None = None
+async def _read_raw_body(request: Request) -> Optional[bytes]:
     try:
         raw_body = await request.body()
         request._body = raw_body  # type: ignore[attr-defined]
+        return raw_body
     except Exception:  # pragma: no cover - best effort fallback
-        raw_body = None
-    try:
-        form = await request.form()
-        payload, uploads = await parse_form_data(form, temp_dir)
-        remote_uploads = await download_remote_files(payload, temp_dir)
-        uploads.extend(remote_uploads)
-        form_key = detect_form_key(payload, forced_form_key)
-        raw_body_path = save_raw_body(raw_body)
-        mapping = mapping_store.get_form(form_key)
-        if not mapping:
-            write_log_entry(
-                source=form_key,
-                payload_raw=payload,
-                extra={"action": "mapping_not_found", "raw_body_path": raw_body_path},
-            )
-            return JSONResponse({"status": "ok", "note": f"Mapping for form '{form_key}' is not configured"})
+        return None
+
 
+async def dispatch_form(
+    form_key: str,
+    mapping: Optional[FormMapping],
+    payload: Dict[str, Any],
+    uploads: List[SavedUpload],
+    *,
+    raw_body_path: Optional[str] = None,
+) -> JSONResponse:
+    if not mapping:
         write_log_entry(
             source=form_key,
             payload_raw=payload,
-            extra={"action": "payload_received", "raw_body_path": raw_body_path},
+            extra={"action": "mapping_not_found", "raw_body_path": raw_body_path},
         )
-        if mapping.kind == "secondary":
-            result = await handle_secondary_form(form_key, mapping, payload, raw_body_path=raw_body_path)
-        else:
-            result = await handle_primary_form(form_key, mapping, payload, uploads, raw_body_path=raw_body_path)
-        return JSONResponse(result)
+        return JSONResponse({"status": "ok", "note": f"Mapping for form '{form_key}' is not configured"})
+
+    write_log_entry(
+        source=form_key,
+        payload_raw=payload,
+        extra={"action": "payload_received", "raw_body_path": raw_body_path},
+    )
+    if mapping.kind == "secondary":
+        result = await handle_secondary_form(form_key, mapping, payload, raw_body_path=raw_body_path)
+    else:
+        result = await handle_primary_form(form_key, mapping, payload, uploads, raw_body_path=raw_body_path)
+    return JSONResponse(result)
+
+
+def _bitrix_failure(
+    exc: BitrixError,
+    *,
+    source: str,
+    payload: Dict[str, Any],
+    raw_body: Optional[bytes],
+    raw_body_path: Optional[str],
+) -> HTTPException:
+    write_log_entry(
+        source=source,
+        payload_raw=payload,
+        extra={"error": str(exc), "raw_body_path": raw_body_path or save_raw_body(raw_body)},
+    )
+    return HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc))
+
+
+async def process_tilda_request(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    *,
+    form_key: Optional[str] = None,
+    mapping: Optional[FormMapping] = None,
+    upload_fields: Optional[Collection[str]] = None,
+) -> JSONResponse:
+    temp_dir = create_temp_directory()
+    source = form_key or "unknown"
+    payload: Dict[str, Any] = {}
+    raw_body: Optional[bytes] = None
+    raw_body_path: Optional[str] = None
+    cleanup_scheduled = False
+    try:
+        parsed = await read_tilda_form(request, temp_dir, upload_fields=upload_fields)
+        payload, uploads = parsed.payload, parsed.uploads
+        raw_body, raw_body_path = parsed.raw_body, parsed.raw_body_path
+        if upload_fields is None or upload_fields:
+            uploads.extend(await download_remote_files(payload, temp_dir))
+        if form_key is None:
+            try:
+                source = detect_form_key(parsed.form_keys)
+            except HTTPException:
+                # Nothing is logged for an unidentified form, so its streamed dump would be orphaned.
+                discard_raw_body(raw_body_path)
+                raise
+            mapping = await get_mapping_store().get_form(source)
+        raw_body_path = raw_body_path or save_raw_body(raw_body)
+        response = await dispatch_form(source, mapping, payload, uploads, raw_body_path=raw_body_path)
+        # Error responses drop background tasks, so only a successful response defers the cleanup.
+        background_tasks.add_task(shutil.rmtree, temp_dir, ignore_errors=True)
+        cleanup_scheduled = True
+        return response
     except BitrixError as exc:
-        raw_path_error = raw_body_path if 'raw_body_path' in locals() and raw_body_path else save_raw_body(raw_body)
-        write_log_entry(
-            source=forced_form_key or form_key if 'form_key' in locals() else "unknown",
-            payload_raw=payload if 'payload' in locals() else {},
-            extra={"error": str(exc), "raw_body_path": raw_path_error},
-        )
-        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc)) from exc
+        raise _bitrix_failure(
+            exc, source=source, payload=payload, raw_body=raw_body, raw_body_path=raw_body_path
+        ) from exc
     finally:
-        shutil.rmtree(temp_dir, ignore_errors=True)
+        if not cleanup_scheduled:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+async def process_named_tilda_request(request: Request, background_tasks: BackgroundTasks, form_key: str) -> JSONResponse:
+    form_key = normalize_form_key(form_key)
+    mapping = await get_mapping_store().get_form(form_key)
+    upload_fields = FILE_TARGET_FIELDS.keys() if mapping and mapping.kind != "secondary" else ()
+    return await process_tilda_request(
+        request, background_tasks, form_key=form_key, mapping=mapping, upload_fields=upload_fields
+    )
 
 
 @app.post("/webhook/tilda")
-async def handle_tilda_webhook(request: Request) -> JSONResponse:
-    return await process_tilda_request(request)
+async def handle_tilda_webhook(request: Request, background_tasks: BackgroundTasks) -> JSONResponse:
+    return await process_tilda_request(request, background_tasks)
 
 
 @app.post("/webhook/tilda/{form_key}")
-async def handle_named_tilda_webhook(form_key: str, request: Request) -> JSONResponse:
-    return await process_tilda_request(request, forced_form_key=form_key)
+async def handle_named_tilda_webhook(form_key: str, request: Request, background_tasks: BackgroundTasks) -> JSONResponse:
+    return await process_named_tilda_request(request, background_tasks, form_key)
 
 
 async def _read_body_as_dict(request: Request) -> Dict[str, Any]:
-    try:
-        return await request.json()
-    except Exception:
-        temp_dir = create_temp_directory()
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    if "json" in content_type or body.lstrip()[:1] in (b"{", b"["):
         try:
-            form = await request.form()
-            payload, _ = await parse_form_data(form, temp_dir)
-            return payload
-        finally:
-            shutil.rmtree(temp_dir, ignore_errors=True)
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            pass
+    form = await request.form()
+    payload, _, _ = await parse_form_data(form, settings.upload_temp_dir, upload_fields=())
+    return payload
 
 
 @app.post("/webhook/b24")
@@ -692,11 +1019,17 @@ async def health() -> Dict[str, str]:
 
 
 def _load_cached_fields() -> Dict[str, Any]:
+    global _FIELDS_CACHE
     cache_path: Path = settings.bitrix_fields_cache
-    if not cache_path.exists():
+    try:
+        mtime = cache_path.stat().st_mtime
+    except FileNotFoundError:
         raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Bitrix fields cache is empty")
-    with cache_path.open("r", encoding="utf-8") as handle:
-        return json.load(handle)
+    if _FIELDS_CACHE is not None and _FIELDS_CACHE[0] == mtime:
+        return _FIELDS_CACHE[1]
+    fields = orjson.loads(cache_path.read_bytes())
+    _FIELDS_CACHE = (mtime, fields)
+    return fields
 
 
 @app.get("/bitrix/fields")
@@ -709,7 +1042,7 @@ async def get_bitrix_fields(refresh: bool = False) -> Dict[str, Any]:
 @app.get("/tilda/forms")
 async def list_tilda_forms(project_id: Optional[int] = Query(default=None, ge=1)) -> Dict[str, Any]:
     try:
-        forms = await tilda_client.list_forms(project_id=project_id)
+        forms = await get_tilda_client().list_forms(project_id=project_id)
     except TildaError as exc:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc)) from exc
     return {"forms": forms}
@@ -718,7 +1051,7 @@ async def list_tilda_forms(project_id: Optional[int] = Query(default=None, ge=1)
 @app.get("/tilda/forms/{form_id}")
 async def get_tilda_form(form_id: int) -> Dict[str, Any]:
     try:
-        form = await tilda_client.get_form(form_id)
+        form = await get_tilda_client().get_form(form_id)
     except TildaError as exc:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc)) from exc
     return form
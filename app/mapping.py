@@ -1,13 +1,28 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import functools
+import os
+import sys
+import time
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, Optional, Tuple
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+import orjson
 
 from .config import settings
 
 
+MISSING_RECHECK_SECONDS = 0.5
+
+DEFAULT_FILE_FIELD_MAP = {
+    "Показ": settings.bitrix_show_file_field,
+    "Маркет": settings.bitrix_market_file_field,
+}
+
+
 @dataclass
 class SearchFields:
     inn_keys: Tuple[str, ...] = ()
@@ -19,25 +34,51 @@ class SearchFields:
 @dataclass
 class FormMapping:
     name: str
-    deal_fields: Dict[str, str]
-    contact_fields: Dict[str, str] = field(default_factory=dict)
+    deal_fields: Mapping[str, str]
+    contact_fields: Mapping[str, str] = field(default_factory=dict)
     kind: str = "primary"
     participation_field: Optional[str] = None
-    file_field_map: Dict[str, str] = field(default_factory=dict)
+    file_field_map: Mapping[str, str] = field(default_factory=dict)
     search: SearchFields = field(default_factory=SearchFields)
+    _deal_inverse: Dict[str, Tuple[str, ...]] = field(init=False, repr=False, compare=False)
+    _contact_inverse: Dict[str, Tuple[str, ...]] = field(init=False, repr=False, compare=False)
+    effective_file_fields: Dict[str, str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._deal_inverse = _invert(self.deal_fields)
+        self._contact_inverse = _invert(self.contact_fields)
+        self.effective_file_fields = {**DEFAULT_FILE_FIELD_MAP, **self.file_field_map}
 
     def deal_field_for_bitrix(self, bitrix_field: str) -> Tuple[str, ...]:
-        return tuple(key for key, value in self.deal_fields.items() if value == bitrix_field)
+        return self._deal_inverse.get(bitrix_field, ())
 
     def contact_field_for_bitrix(self, bitrix_field: str) -> Tuple[str, ...]:
-        return tuple(key for key, value in self.contact_fields.items() if value == bitrix_field)
+        return self._contact_inverse.get(bitrix_field, ())
+
+
+def _invert(fields: Mapping[str, str]) -> Dict[str, Tuple[str, ...]]:
+    inverse: Dict[str, Tuple[str, ...]] = {}
+    for form_field, bitrix_field in fields.items():
+        inverse[bitrix_field] = inverse.get(bitrix_field, ()) + (form_field,)
+    return inverse
+
+
+def _string_fields(raw: Dict[str, object]) -> Mapping[str, str]:
+    if all(isinstance(value, str) for value in raw.values()):
+        return MappingProxyType(raw)  # type: ignore[arg-type]
+    return MappingProxyType({key: value for key, value in raw.items() if isinstance(value, str)})
 
 
 class MappingStore:
-    def __init__(self, mapping_path: Path) -> None:
+    def __init__(self, mapping_path: Path, check_interval: float = 0.0) -> None:
         self._path = mapping_path
+        self._path_str = os.fspath(mapping_path)
+        self._check_interval = check_interval
         self._cache: Dict[str, FormMapping] | None = None
         self._mtime: float | None = None
+        self._last_check = 0.0
+        self._missing_until = 0.0
+        self._reload_lock: asyncio.Lock | None = None
 
     def _normalize_sequence(self, data: object) -> Tuple[str, ...]:
         if data is None:
@@ -76,8 +117,7 @@ class MappingStore:
         if not isinstance(raw, dict):
             raise ValueError("Each form entry must be an object")
         if raw and all(isinstance(value, str) for value in raw.values()):
-            deal_fields = {str(k): str(v) for k, v in raw.items() if isinstance(v, str)}
-            mapping = FormMapping(name=name, deal_fields=deal_fields)
+            mapping = FormMapping(name=name, deal_fields=_string_fields(raw))
             mapping.search = self._build_search_fields(mapping, {})
             return mapping
 
@@ -96,43 +136,61 @@ class MappingStore:
             raise ValueError(f"Form '{name}' file_fields must be an object")
         mapping = FormMapping(
             name=name,
-            deal_fields={str(k): str(v) for k, v in deal_fields.items() if isinstance(v, str)},
-            contact_fields={str(k): str(v) for k, v in (contact_fields or {}).items() if isinstance(v, str)},
+            deal_fields=_string_fields(deal_fields),
+            contact_fields=_string_fields(contact_fields or {}),
             kind=kind,
             participation_field=participation_field,
-            file_field_map={str(k): str(v) for k, v in (file_field_map or {}).items() if isinstance(v, str)},
+            file_field_map=_string_fields(file_field_map or {}),
         )
         mapping.search = self._build_search_fields(mapping, raw.get("search") or {})
         return mapping
 
-    def _load(self) -> None:
-        if not self._path.exists():
-            raise FileNotFoundError(f"Mapping file not found: {self._path}")
-        with self._path.open("r", encoding="utf-8") as handle:
-            data = json.load(handle)
+    def _load(self, mtime: float) -> None:
+        with open(self._path_str, "rb") as handle:
+            data = orjson.loads(handle.read())
         if not isinstance(data, dict):
             raise ValueError("mapping.json must contain an object at the top level")
         cache: Dict[str, FormMapping] = {}
         for form_name, raw in data.items():
-            cache[str(form_name)] = self._parse_form(str(form_name), raw)
+            name = sys.intern(form_name)
+            cache[name] = self._parse_form(name, raw)
         self._cache = cache
-        self._mtime = self._path.stat().st_mtime
-
-    def _ensure_loaded(self) -> None:
-        needs_reload = False
-        if self._cache is None:
-            needs_reload = True
-        else:
-            current_mtime = self._path.stat().st_mtime
-            if self._mtime is None or current_mtime > self._mtime:
-                needs_reload = True
-        if needs_reload:
-            self._load()
-
-    def get_form(self, form_key: str) -> Optional[FormMapping]:
-        self._ensure_loaded()
+        self._mtime = mtime
+
+    def _is_fresh(self, now: float) -> bool:
+        return self._cache is not None and now - self._last_check < self._check_interval
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if self._is_fresh(now):
+            return
+        if now < self._missing_until:
+            raise FileNotFoundError(f"Mapping file not found: {self._path}")
+        try:
+            current_mtime = os.stat(self._path_str).st_mtime
+        except FileNotFoundError:
+            self._missing_until = now + MISSING_RECHECK_SECONDS
+            raise FileNotFoundError(f"Mapping file not found: {self._path}") from None
+        if self._cache is None or self._mtime is None or current_mtime > self._mtime:
+            self._load(current_mtime)
+        self._last_check = now
+
+    async def _ensure_loaded(self) -> None:
+        if self._is_fresh(time.monotonic()):
+            return
+        if self._reload_lock is None:
+            self._reload_lock = asyncio.Lock()
+        # Coroutines that queued behind a reload find the cache fresh and skip their own.
+        async with self._reload_lock:
+            if not self._is_fresh(time.monotonic()):
+                await asyncio.to_thread(self._refresh)
+
+    async def get_form(self, form_key: str) -> Optional[FormMapping]:
+        await self._ensure_loaded()
         assert self._cache is not None
         return self._cache.get(form_key)
 
 
-mapping_store = MappingStore(settings.mapping_file)
+@functools.cache
+def get_mapping_store() -> MappingStore:
+    return MappingStore(settings.mapping_file, settings.mapping_check_interval_seconds)
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
 
 import httpx
+import orjson
 
 from .config import settings
 
+FORM_CACHE_SIZE = 512
+
 
 class TildaError(RuntimeError):
     pass
@@ -16,48 +22,102 @@ class TildaClient:
         self._client = httpx.AsyncClient(
             base_url=settings.tilda_api_base_url,
             timeout=settings.request_timeout_seconds,
+            # Limits and HTTP/2 live on the transport once one is passed explicitly.
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30),
+                retries=1,
+            ),
         )
+        self._auth_qs: Optional[str] = None
+        self._default_list_url: Optional[str] = None
+        self._form_cache: Dict[int, Tuple[float, Dict[str, Any]]] = {}
+        self._form_inflight: Dict[int, asyncio.Future[Dict[str, Any]]] = {}
 
     async def close(self) -> None:
         await self._client.aclose()
 
-    def _auth_params(self) -> Dict[str, str]:
-        if not settings.tilda_public_key or not settings.tilda_secret_key:
-            raise TildaError("Tilda API keys are not configured")
-        return {
-            "publickey": settings.tilda_public_key,
-            "secretkey": settings.tilda_secret_key,
-        }
+    def _auth_query(self) -> str:
+        if self._auth_qs is None:
+            if not settings.tilda_public_key or not settings.tilda_secret_key:
+                raise TildaError("Tilda API keys are not configured")
+            self._auth_qs = urlencode(
+                {
+                    "publickey": settings.tilda_public_key,
+                    "secretkey": settings.tilda_secret_key,
+                }
+            )
+        return self._auth_qs
+
+    def _list_forms_url(self, project_id: Optional[int]) -> str:
+        if project_id:
+            return f"project/getformslist/?{self._auth_query()}&projectid={int(project_id)}"
+        if self._default_list_url is None:
+            url = f"project/getformslist/?{self._auth_query()}"
+            if settings.tilda_project_id is not None:
+                url += f"&projectid={int(settings.tilda_project_id)}"
+            self._default_list_url = url
+        return self._default_list_url
 
     async def list_forms(self, project_id: Optional[int] = None) -> List[Dict[str, Any]]:
-        params = self._auth_params()
-        project = project_id or settings.tilda_project_id
-        if project is not None:
-            params["projectid"] = project
-        response = await self._client.get("project/getformslist/", params=params)
-        response.raise_for_status()
-        data = response.json()
-        result = data.get("result")
+        response = await self._client.get(self._list_forms_url(project_id))
+        if response.status_code >= 400:
+            raise TildaError(f"Tilda HTTP {response.status_code}: {response.text[:200]}")
+        data = orjson.loads(response.content)
+        try:
+            result = data["result"]
+        except (KeyError, TypeError):
+            result = None
         if result is None:
             raise TildaError(f"Unexpected response from Tilda: {data}")
-        if isinstance(result, dict) and "forms" in result:
-            forms = result["forms"]
-        else:
-            forms = result
-        if not isinstance(forms, list):
+        forms = result.get("forms", result) if type(result) is dict else result
+        if type(forms) is not list:
             raise TildaError(f"Tilda did not return a list of forms: {data}")
         return forms
 
     async def get_form(self, form_id: int) -> Dict[str, Any]:
-        params = self._auth_params()
-        params["formid"] = form_id
-        response = await self._client.get("form/getform/", params=params)
-        response.raise_for_status()
-        data = response.json()
-        result = data.get("result")
-        if not isinstance(result, dict):
-            raise TildaError(f"Unexpected response from Tilda: {data}")
-        return result
+        cached = self._form_cache.get(form_id)
+        if cached is not None and time.monotonic() < cached[0]:
+            return cached[1]
+        pending = self._form_inflight.get(form_id)
+        if pending is None:
+            pending = asyncio.ensure_future(self._fetch_form(form_id))
+            self._form_inflight[form_id] = pending
+        return await asyncio.shield(pending)
+
+    async def _fetch_form(self, form_id: int) -> Dict[str, Any]:
+        try:
+            response = await self._client.get(f"form/getform/?{self._auth_query()}&formid={int(form_id)}")
+            if response.status_code >= 400:
+                raise TildaError(f"Tilda HTTP {response.status_code}: {response.text[:200]}")
+            data = orjson.loads(response.content)
+            try:
+                result = data["result"]
+            except (KeyError, TypeError):
+                result = None
+            if type(result) is not dict:
+                raise TildaError(f"Unexpected response from Tilda: {data}")
+            self._form_cache.pop(form_id, None)
+            if len(self._form_cache) >= FORM_CACHE_SIZE:
+                self._form_cache.pop(next(iter(self._form_cache)))
+            self._form_cache[form_id] = (time.monotonic() + settings.tilda_form_cache_seconds, result)
+            return result
+        finally:
+            self._form_inflight.pop(form_id, None)
+
+
+_tilda_client: Optional[TildaClient] = None
+
+
+def get_tilda_client() -> TildaClient:
+    global _tilda_client
+    if _tilda_client is None:
+        _tilda_client = TildaClient()
+    return _tilda_client
 
 
-tilda_client = TildaClient()
+async def close_tilda_client() -> None:
+    global _tilda_client
+    if _tilda_client is not None:
+        await _tilda_client.close()
+        _tilda_client = None
@@ -0,0 +1,107 @@
+import asyncio
+import os
+
+os.environ.setdefault("BITRIX_TILDA_BITRIX_WEBHOOK_BASE_URL", "https://example.bitrix24.ru/rest/1/token/")
+
+import httpx  # noqa: E402
+import orjson  # noqa: E402
+import pytest  # noqa: E402
+from multipart.multipart import create_form_parser  # noqa: E402
+
+from app import main  # noqa: E402
+from app.bitrix import UPLOAD_CHUNK_SIZE, BitrixClient, BitrixError, _flatten_params  # noqa: E402
+
+
+def _client(handler) -> BitrixClient:
+    client = BitrixClient()
+    client._client = httpx.AsyncClient(
+        base_url="https://example.bitrix24.ru/rest/1/token/",
+        transport=httpx.MockTransport(handler),
+    )
+    return client
+
+
+def _batch_handler(result, result_error):
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path.endswith("/batch")
+        return httpx.Response(200, json={"result": {"result": result, "result_error": result_error}})
+
+    return handler
+
+
+def _contacts(client: BitrixClient):
+    filters = [{"PHONE": "+70000000000"}, {"EMAIL": "a@b.c"}, {"COMPANY_TITLE": "Acme"}]
+    return asyncio.run(client.list_contacts_batch(filters))
+
+
+def test_error_after_first_hit_is_ignored():
+    client = _client(_batch_handler({"q0": [{"ID": "7"}], "q1": []}, {"q2": {"error": "ERROR_CORE"}}))
+    assert main._first_hit(_contacts(client)) == {"ID": "7"}
+
+
+def test_error_before_first_hit_is_raised():
+    client = _client(_batch_handler({"q1": [{"ID": "7"}]}, {"q0": {"error_description": "bad phone"}}))
+    with pytest.raises(BitrixError, match="bad phone"):
+        main._first_hit(_contacts(client))
+
+
+def test_batch_commands_keep_filter_order():
+    seen = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.update(orjson.loads(request.content)["cmd"])
+        return httpx.Response(200, json={"result": {"result": {}, "result_error": []}})
+
+    assert _contacts(_client(handler)) == [[], [], []]
+    assert list(seen) == ["q0", "q1", "q2"]
+
+
+def test_flatten_params_nested_filter_and_select():
+    params = {
+        "filter": {"CATEGORY_ID": 6, "=UF_INN": "123", "@STAGE_ID": ["C6:NEW", "C6:WON"]},
+        "select": ["ID", "TITLE"],
+        "start": 0,
+    }
+    assert _flatten_params(params) == [
+        ("filter[CATEGORY_ID]", 6),
+        ("filter[=UF_INN]", "123"),
+        ("filter[@STAGE_ID][0]", "C6:NEW"),
+        ("filter[@STAGE_ID][1]", "C6:WON"),
+        ("select[0]", "ID"),
+        ("select[1]", "TITLE"),
+        ("start", 0),
+    ]
+
+
+def test_upload_file_body_round_trips(tmp_path):
+    source = tmp_path / 'report "final".pdf'
+    content = bytes(range(256)) * 4097
+    source.write_bytes(content)
+    sent = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent["headers"] = request.headers
+        sent["body"] = request.read()
+        return httpx.Response(200, json={"result": {"ID": 42}})
+
+    assert len(content) > UPLOAD_CHUNK_SIZE
+    assert asyncio.run(_client(handler).upload_file("15", source)) == "42"
+
+    body = sent["body"]
+    assert int(sent["headers"]["content-length"]) == len(body)
+    fields, files = {}, {}
+
+    def on_field(field):
+        fields[field.field_name.decode()] = field.value.decode()
+
+    def on_file(file):
+        file.file_object.seek(0)
+        files[file.field_name.decode()] = (file.file_name.decode(), file.file_object.read())
+
+    parser = create_form_parser(
+        {"Content-Type": sent["headers"]["content-type"], "Content-Length": str(len(body))}, on_field, on_file
+    )
+    parser.write(body)
+    parser.finalize()
+    assert fields == {"id": "15", "generateUniqueName": "true"}
+    assert files == {"file": ("report %22final%22.pdf", content)}
@@ -0,0 +1,136 @@
+import asyncio
+import os
+
+os.environ.setdefault("BITRIX_TILDA_BITRIX_WEBHOOK_BASE_URL", "https://example.bitrix24.ru/rest/1/token/")
+
+import pytest  # noqa: E402
+from starlette.exceptions import HTTPException  # noqa: E402
+from starlette.formparsers import MultiPartException  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+
+from app import main  # noqa: E402
+
+BOUNDARY = "XyZboundary"
+
+
+def _part(name, value, *, filename=None, charset="utf-8"):
+    disposition = f'form-data; name="{name}"'
+    if filename is not None:
+        disposition += f'; filename="{filename}"'
+    head = f"--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n"
+    if filename is not None:
+        head += "Content-Type: application/octet-stream\r\n"
+    data = value if isinstance(value, bytes) else value.encode(charset)
+    return head.encode(charset) + b"\r\n" + data + b"\r\n"
+
+
+def _body(*parts):
+    return b"".join(parts) + f"--{BOUNDARY}--\r\n".encode()
+
+
+def _request(body, charset=None):
+    content_type = f"multipart/form-data; boundary={BOUNDARY}"
+    if charset:
+        content_type += f"; charset={charset}"
+    chunks = [body[i : i + 7] for i in range(0, len(body), 7)]
+
+    async def receive():
+        if chunks:
+            return {"type": "http.request", "body": chunks.pop(0), "more_body": bool(chunks)}
+        return {"type": "http.disconnect"}
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/webhook/tilda",
+        "headers": [(b"content-type", content_type.encode())],
+    }
+    return Request(scope, receive)
+
+
+def _uploads(uploads):
+    return sorted((upload.field, upload.filename, upload.path.read_bytes()) for upload in uploads)
+
+
+def _parse_both(tmp_path, body, charset=None, upload_fields=None):
+    async def run():
+        stream_dir = tmp_path / "stream"
+        form_dir = tmp_path / "form"
+        stream_dir.mkdir()
+        form_dir.mkdir()
+        streamed = await main.stream_form_data(_request(body, charset), stream_dir, upload_fields=upload_fields)
+        form = await _request(body, charset).form()
+        payload, uploads, form_keys = await main.parse_form_data(form, form_dir, upload_fields=upload_fields)
+        return streamed, (payload, uploads, form_keys)
+
+    return asyncio.run(run())
+
+
+@pytest.fixture(autouse=True)
+def _temp_root(monkeypatch, tmp_path):
+    monkeypatch.setattr(main.settings, "upload_temp_dir", tmp_path / "uploads")
+
+
+def test_stream_matches_request_form(tmp_path):
+    body = _body(
+        _part("formid", "form-1"),
+        _part("formname", "Заявка"),
+        _part("tags", "a"),
+        _part("tags", "b"),
+        _part("linesheet", b"\x00sheet\xff", filename="sheet.pdf"),
+        _part("other_file", b"skip me", filename="other.bin"),
+        _part("linesheet", b"second", filename="second.pdf"),
+    )
+    streamed, (payload, uploads, form_keys) = _parse_both(tmp_path, body, upload_fields={"linesheet"})
+    assert streamed.payload == payload == {"formid": "form-1", "formname": "Заявка", "tags": ["a", "b"]}
+    assert streamed.form_keys == form_keys == {"formid": "form-1", "formname": "Заявка"}
+    assert _uploads(streamed.uploads) == _uploads(uploads) == [
+        ("linesheet", "second.pdf", b"second"),
+        ("linesheet", "sheet.pdf", b"\x00sheet\xff"),
+    ]
+    assert not list((tmp_path / "stream").glob("other*"))
+
+
+def test_repeated_identifier_is_not_a_form_key(tmp_path):
+    body = _body(_part("formid", "one"), _part("formid", "two"), _part("form_id", "f-1"), _part("lable", " "))
+    streamed, (payload, _, form_keys) = _parse_both(tmp_path, body)
+    assert streamed.payload == payload == {"formid": ["one", "two"], "form_id": "f-1", "lable": " "}
+    assert streamed.form_keys == form_keys == {"form_id": "f-1"}
+
+
+def test_non_utf8_charset(tmp_path):
+    body = _body(_part("name", "Иван", charset="cp1251"), _part("city", "Москва", charset="cp1251"))
+    streamed, (payload, _, _) = _parse_both(tmp_path, body, charset="cp1251")
+    assert streamed.payload == payload == {"name": "Иван", "city": "Москва"}
+
+
+def test_missing_name_is_rejected(tmp_path):
+    body = f"--{BOUNDARY}\r\nContent-Disposition: form-data\r\n\r\nvalue\r\n--{BOUNDARY}--\r\n".encode()
+
+    async def read_form():
+        return await _request(body).form()
+
+    with pytest.raises(HTTPException) as streamed:
+        asyncio.run(main.stream_form_data(_request(body), tmp_path))
+    with pytest.raises(MultiPartException) as form:
+        asyncio.run(read_form())
+    assert streamed.value.status_code == 400
+    assert streamed.value.detail == form.value.message
+    assert not list((tmp_path / "uploads" / "raw").glob("*"))
+
+
+def test_raw_body_is_teed_to_disk(tmp_path):
+    body = _body(_part("formid", "form-1"), _part("linesheet", b"data", filename="a.pdf"))
+    streamed, _ = _parse_both(tmp_path, body)
+    with open(streamed.raw_body_path, "rb") as handle:
+        assert handle.read() == body
+
+
+def test_part_counts_are_limited(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "MULTIPART_MAX_FILES", 2)
+    body = _body(*(_part("linesheet", b"x", filename=f"{index}.pdf") for index in range(3)))
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(main.stream_form_data(_request(body), tmp_path))
+    assert exc.value.status_code == 400
+    assert "Too many files" in exc.value.detail
@@ -0,0 +1,27 @@
+import os
+
+os.environ.setdefault("BITRIX_TILDA_BITRIX_WEBHOOK_BASE_URL", "https://example.bitrix24.ru/rest/1/token/")
+
+from app import main  # noqa: E402
+from app.mapping import FormMapping  # noqa: E402
+
+
+def _extract(monkeypatch, keywords, value):
+    monkeypatch.setattr(main, "PARTICIPATION_KEYWORDS", tuple((keyword.lower(), keyword) for keyword in keywords))
+    mapping = FormMapping(name="form", deal_fields={}, participation_field="participation")
+    return main.extract_participation_types(mapping, {"participation": value})
+
+
+def test_prefix_keywords_are_all_matched(monkeypatch):
+    keywords = ["Маркет", "Маркет Плюс", "Показ"]
+    assert _extract(monkeypatch, keywords, "Маркет Плюс") == ["Маркет", "Маркет Плюс"]
+
+
+def test_keywords_are_deduplicated_across_tokens(monkeypatch):
+    keywords = ["Показ", "Маркет", "Шоурум"]
+    assert _extract(monkeypatch, keywords, ["шоурум; маркет", "Показ", "маркет"]) == ["Шоурум", "Маркет", "Показ"]
+
+
+def test_keyword_equal_to_alias_is_not_duplicated(monkeypatch):
+    keywords = ["Маркет / Шоурум", "Показ"]
+    assert _extract(monkeypatch, keywords, ["маркет/шоурум", "Маркет / Шоурум; Показ"]) == ["Маркет / Шоурум", "Показ"]